@@ -2,6 +2,7 @@
 
 
 import random
+import threading
 
 from enumeration import Status, Entity, Action, CardinalDirection
 from motion import turn, move_forward
@@ -101,23 +102,25 @@ class Agent:
     Returns True if the action kills the Wumpus, otherwise False."""
     kind, rotations = action
     if kind == Action.Move:
-      self.move(rotations)
+      self.move(rotations, cave.size)
     elif kind == Action.Shoot:
       if rotations is not None:
         self.direction = turn(self.direction, rotations)
       return self.shoot(cave, kb)
     elif kind == Action.Grab:
-      cave[self.location].gold = Status.Absent
-      self.has_gold = True
+      # the gold may have already been grabbed by someone else
+      if cave[self.location].gold == Status.Present:
+        cave[self.location].gold = Status.Absent
+        self.has_gold = True
     elif kind == Action.Turn:
       self.direction = turn(self.direction, rotations)
     return False
 
-  def move(self, rotations):
+  def move(self, rotations, size=(4, 4)):
     """Moves the agent."""
     for steps in rotations:
       self.direction = turn(self.direction, steps)
-      self.location = move_forward(self.location, self.direction)
+      self.location = move_forward(self.location, self.direction, size)
 
   def shoot(self, cave, kb):
     """Shoots the arrow and check if the Wumpus was hit."""
@@ -166,7 +169,8 @@ class Agent:
           kb.kill_wumpus()
           return True
         i -= 1
-    # the arrow didin't hit the Wumpus
+    # the arrow didin't hit the Wumpus but cleared its path
+    kb.notify()
     return False
 
 
@@ -183,6 +187,13 @@ class Knowledge:
     self._rooms = [[Room(*status) for x in range(w)] for y in range(h)]
     # the cave entry is safe and without gold
     self._rooms[0][0] = Room()
+    # the knowledge can be shared by several agents exploring the same cave
+    self.lock = threading.RLock()
+    # unexplored rooms each agent is currently heading to
+    self._claims = {}
+    # bumped (and notified) whenever other agents may find something new to do
+    self.revision = 0
+    self.changed = threading.Condition(self.lock)
 
   def __repr__(self):
     """Returns the string representation of this instance."""
@@ -230,11 +241,37 @@ class Knowledge:
     """Returns a generator of indexes of unexplored rooms."""
     return self.rooms(lambda r: not r.is_explored)
 
+  def claim(self, owner, location):
+    """Reserves the unexplored room in location for the given agent."""
+    with self.lock:
+      self._claims[owner] = location
+
+  def release(self, owner, notify=True):
+    """Releases the room reserved by the given agent (if any) and returns it."""
+    with self.lock:
+      location = self._claims.pop(owner, None)
+      if location is not None and notify:
+        self.notify()
+      return location
+
+  def claimed(self, owner=None):
+    """Returns the set of rooms reserved by agents other than owner."""
+    with self.lock:
+      return {l for o, l in self._claims.items() if o is not owner}
+
   def kill_wumpus(self):
     """Change the status of any room such that there can't be the Wumpus."""
-    for path in self._rooms:
-      for room in path:
-        room.wumpus = Status.Absent
+    with self.lock:
+      for path in self._rooms:
+        for room in path:
+          room.wumpus = Status.Absent
+      self.notify()
+
+  def notify(self):
+    """Wakes up the agents waiting for the knowledge to change."""
+    with self.lock:
+      self.revision += 1
+      self.changed.notify_all()
 
 
 
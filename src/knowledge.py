@@ -2,12 +2,29 @@
 
 
 import random
+import functools
 
 from enumeration import Status, Entity, Action, Goal
 from motion import neighbors, spins, known_path, path_to_spins
 
 
 
+def synchronized(function):
+  """Decorator that serializes the access to the (shared) knowledge."""
+  @functools.wraps(function)
+  def wrapper(kb, *args, **kwargs):
+    with kb.lock:
+      return function(kb, *args, **kwargs)
+  return wrapper
+
+
+def frontier(kb, loc):
+  """Returns True if the room is unexplored, not known to be deadly and
+  next to an explored room."""
+  return kb[loc].is_unexplored and not kb[loc].is_deadly() and \
+    any(kb[l].is_explored for l in neighbors(loc, kb.size))
+
+
 def perceive(kb, loc):
   """Returns a tuple containing the agent local perceptions.
   Returns None if the agent has been killed by the Wumpus or falling in a pit."""
@@ -18,7 +35,7 @@ def perceive(kb, loc):
   # build perceptions
   wumpus, pit, gold = (Status.Absent,) * 3
   # look neighboring cells to update perceptions
-  for room in [kb[l] for l in neighbors(loc)]:
+  for room in [kb[l] for l in neighbors(loc, kb.size)]:
     # check if the wumpus is in this room
     if room.wumpus == Status.Present:
       wumpus = Status.Present
@@ -36,13 +53,25 @@ def perceive(kb, loc):
   return wumpus, pit, gold
 
 
+@synchronized
+def settle(kb, previous):
+  """Wakes up the waiting agents if the room previously reserved can now be
+  explored by them, or if there are no more reserved rooms to wait for."""
+  if previous is not None and previous not in kb.claimed():
+    if frontier(kb, previous) or not kb.claimed():
+      kb.notify()
+
+
+@synchronized
 def tell(kb, perceptions, loc):
   """Update knowledge according to the given perception and location."""
+  around = [loc] + list(neighbors(loc, kb.size))
+  before = {l for l in around if frontier(kb, l)}
   # the agent is alive and perceived something therefore:
   # there are neither pits nor the Wumpus in this room
   kb[loc].wumpus = kb[loc].pit = Status.Absent
   wumpus, pit, gold = perceptions
-  near = [kb[l] for l in neighbors(loc)]
+  near = [kb[l] for l in neighbors(loc, kb.size)]
   # iterate over not safe neighboring rooms
   for room in (r for r in near if not r.is_safe()):
     # parse Wumpus perception
@@ -78,8 +107,12 @@ def tell(kb, perceptions, loc):
           room.pit = Status.LikelyPresent
   # parse gold perception
   kb[loc].gold = gold
+  # let the waiting agents know only if there are new rooms to explore
+  if not {l for l in around if frontier(kb, l)} <= before:
+    kb.notify()
 
 
+@synchronized
 def update(kb, loc):
   """Update the knowledge."""
   # update the knowledge according to all the already explored cells
@@ -87,11 +120,31 @@ def update(kb, loc):
     tell(kb, perceive(kb, l), l)
 
 
-def ask(kb, loc, direction, goal):
+@synchronized
+def ask(kb, loc, direction, goal, owner=None):
   """Returns an action according to the current state of the knowledge.
   The action is a tuple: the first element is the type of the action, while
   the second element is a list of movement if the type is Action.Move,
-  or Shoot, otherwise None."""
+  or Shoot, otherwise None.
+  When the knowledge is shared, owner is the agent asking: the unexplored room
+  it is sent to is reserved, so that no other agent is sent to the same room."""
+  # forget the room previously reserved (unless reserved again)
+  previous = kb.release(owner, notify=False)
+  action = choose(kb, loc, direction, goal, owner)
+  settle(kb, previous)
+  return action
+
+
+def choose(kb, loc, direction, goal, owner):
+  """Chooses the action for ask, reserving the unexplored room it leads to."""
+  # avoid the rooms reserved by others
+  taken = kb.claimed(owner)
+  free = lambda l: l not in taken
+  def move_to(dest, path):
+    # reserve the unexplored room this agent is heading to
+    if owner is not None:
+      kb.claim(owner, dest)
+    return Action.Move, path_to_spins(path, direction)
   # if the agent is seeking gold
   if goal == Goal.SeekGold:
     # check if this room contains the gold
@@ -99,44 +152,45 @@ def ask(kb, loc, direction, goal):
       return Action.Grab, None
     # get the first neighbor room safe and unexplored (if any)
     state = lambda r: r.is_safe() and r.is_unexplored
-    dest = next((l for l in neighbors(loc) if state(kb[l])), None)
+    near = neighbors(loc, kb.size)
+    dest = next((l for l in near if free(l) and state(kb[l])), None)
     if dest:
-      return Action.Move, (spins(loc, direction, dest),)
+      return move_to(dest, (loc, dest))
     # get any room safe and unexplored (if the agent can reach it)
-    state = lambda r, l: r.is_safe() and any(kb[x].is_explored for x in neighbors(l))
-    dest = next((l for l in kb.unexplored if state(kb[l], l)), None)
+    state = lambda r, l: r.is_safe() and \
+      any(kb[x].is_explored for x in neighbors(l, kb.size))
+    dest = next((l for l in kb.unexplored if free(l) and state(kb[l], l)), None)
     if dest:
-      path = known_path(kb, loc, dest)
-      return Action.Move, path_to_spins(path, direction)
+      return move_to(dest, known_path(kb, loc, dest))
     # get a neighboring room that (may) contain the Wumpus but no pits
     state = lambda r: r.is_safe(Entity.Pit) and r.is_unsafe(Entity.Wumpus)
-    dest = next((l for l in neighbors(loc) if state(kb[l])), None)
+    near = neighbors(loc, kb.size)
+    dest = next((l for l in near if free(l) and state(kb[l])), None)
     if dest:
       return Action.Shoot, spins(loc, direction, dest)
     # get a room that may contain the Wumpus but no pits
     state = lambda r: r.is_safe(Entity.Pit) and r.is_unsafe(Entity.Wumpus)
-    dest = next((l for l in kb.unexplored if state(kb[l])), None)
+    dest = next((l for l in kb.unexplored if free(l) and state(kb[l])), None)
     if dest:
       # get a neighbor explored cell
-      dest = next((l for l in neighbors(dest) if kb[l].is_explored))
-      path = known_path(kb, loc, dest)
-      return Action.Move, path_to_spins(path, direction)
+      near = next((l for l in neighbors(dest, kb.size) if kb[l].is_explored))
+      return move_to(dest, known_path(kb, loc, near))
     # get a neighboring room that may contain the Wumpus
     state = lambda r: r.is_dangerous(Entity.Wumpus)
-    dest = next((l for l in neighbors(loc) if state(kb[l])), None)
+    near = neighbors(loc, kb.size)
+    dest = next((l for l in near if free(l) and state(kb[l])), None)
     if dest:
       return Action.Shoot, spins(loc, direction, dest)
     # get a random room that may contain a ravine
-    rooms = [l for l in kb.unexplored if kb[l].is_dangerous(Entity.Pit)]
+    state = lambda r: r.is_dangerous(Entity.Pit) and not r.is_deadly()
+    rooms = [l for l in kb.unexplored if free(l) and state(kb[l])]
     if rooms:
       dest = random.choice(rooms)
-      path = known_path(kb, loc, dest)
-      return Action.Move, path_to_spins(path, direction)
-    # get an unexplored cell
-    dest = next((l for l in kb.unexplored), None)
+      return move_to(dest, known_path(kb, loc, dest))
+    # get an unexplored cell not known to be deadly (if the agent can reach it)
+    dest = next((l for l in kb.unexplored if free(l) and frontier(kb, l)), None)
     if dest:
-      path = known_path(kb, loc, dest)
-      return Action.Move, path_to_spins(path, direction)
+      return move_to(dest, known_path(kb, loc, dest))
   elif goal == Goal.BackToEntry:
     # back to the entry
     path = known_path(kb, loc, (0, 0))
@@ -1,6 +1,9 @@
 #! /usr/bin/env python
 
 
+import collections
+
+
 # delta used to move the agent and reach its neighbors
 DELTA = (0, -1), (1, 0), (0, 1), (-1, 0)
 
@@ -39,53 +42,44 @@ def turn(direction, steps):
   return (direction + steps) % len(DELTA)
 
 
-def move_forward(location, direction):
+def move_forward(location, direction, size=(4, 4)):
   """Returns the new location."""
-  return neighbor(location, direction)
+  return neighbor(location, direction, size)
 
 
 def spins(source, direction, destination):
   """Gets the number of rotations needed to have the destination room ahead."""
-  # check if source and destination are neighbors
-  assert source in neighbors(destination)
   # computes the difference between locations
   diff = tuple([a - b for a, b in zip(destination, source)])
+  # check if source and destination are neighbors
+  assert diff in DELTA
   rot = DELTA.index(diff) - direction
   rot = rot if rot != 3 else -1
   # returns the minimum number of spins (clockwise vs counterclockwise)
   return rot
 
 
-def known_path_rec(kb, loc, dest, path, visited):
-  """Depth-first search that builds an explored path to destination."""
-  # check if the location and the destination are the same
-  if loc == dest:
-    return True
-  # generator of explored (but not yet visited by the search) neighbors
-  neighborhood = (l for l in neighbors(loc) if l not in visited 
-                  and (kb[l].is_explored or l == dest))
-  # iterate over each neighbor
-  for n in neighborhood:
-    # add the node to the path
-    path.append(n)
-    visited.add(n)
-    # recursive call
-    if known_path_rec(kb, n, dest, path, visited):
-      return True
-    # backtrack: this node does not lead to the destination
-    visited.remove(n)
-    path.remove(n)
-  return False
-
-
 def known_path(kb, loc, dest):
-  """Returns an explored path to destination."""
-  path = [loc]
-  visited = set()
-  visited.add(loc)
-  # return the path or None if the path wasn't found
-  if known_path_rec(kb, loc, dest, path, visited):
-    return tuple(path)
+  """Returns the shortest explored path to destination."""
+  # breadth-first search over explored rooms, keeping track of predecessors
+  previous = {loc: None}
+  frontier = collections.deque([loc])
+  while frontier:
+    room = frontier.popleft()
+    # check if the destination has been reached
+    if room == dest:
+      path = []
+      while room is not None:
+        path.append(room)
+        room = previous[room]
+      return tuple(reversed(path))
+    # explored (but not yet visited by the search) neighbors
+    for n in neighbors(room, kb.size):
+      if n not in previous and (kb[n].is_explored or n == dest):
+        previous[n] = room
+        frontier.append(n)
+  # the path wasn't found
+  return None
 
 
 def path_to_spins(path, direction):
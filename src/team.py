@@ -0,0 +1,89 @@
+#! /usr/bin/env python
+
+
+import time
+import concurrent.futures
+
+from enumeration import Goal, Status, Entity
+from knowledge import perceive, tell, update, ask, settle
+
+
+
+def step(cave, kb, agent):
+  """Performs a single step of an agent sharing the knowledge with others.
+  Returns False if the agent is dead or has nothing left to do, None if it
+  has to wait for the other agents, otherwise True."""
+  # the whole step is atomic: the agent acts on up to date perceptions
+  with kb.lock:
+    # perceive in current location
+    perceptions = perceive(cave, agent.location)
+    if perceptions is None:
+      # the agent died: let the others know what killed it in this room
+      room = cave[agent.location]
+      if room.is_deadly(Entity.Wumpus):
+        kb[agent.location].wumpus = Status.Present
+      if room.is_deadly(Entity.Pit):
+        kb[agent.location].pit = Status.Present
+      settle(kb, kb.release(agent, notify=False))
+      return False
+    # merge the perceptions into the shared knowledge
+    tell(kb, perceptions, agent.location)
+    update(kb, agent.location)
+    # check if the game is over for this agent
+    if agent.has_gold and agent.location == (0, 0):
+      kb.release(agent)
+      return False
+    goal = Goal.SeekGold if not agent.has_gold else Goal.BackToEntry
+    action = ask(kb, agent.location, agent.direction, goal, agent)
+    if action is None:
+      # wait until the rooms reserved by other agents are explored (if any)
+      return None if kb.claimed(agent) else False
+    # the action may change both the cave and the shared knowledge
+    agent.perform(action, cave, kb)
+    return True
+
+
+def work(cave, kb, agents):
+  """Steps the given agents in turn until all of them are done.
+  Agents that have to wait are skipped until the knowledge changes."""
+  active = list(agents)
+  # knowledge revision at which each waiting agent had nothing to do
+  waiting = {}
+  try:
+    while active:
+      # sleep while all the agents are waiting for the knowledge to change
+      with kb.changed:
+        kb.changed.wait_for(lambda: any(waiting.get(a) != kb.revision
+                                        for a in active))
+      for agent in list(active):
+        revision = kb.revision
+        if waiting.get(agent) == revision:
+          continue
+        moved = step(cave, kb, agent)
+        if moved is None:
+          waiting[agent] = revision
+        else:
+          waiting.pop(agent, None)
+          if not moved:
+            active.remove(agent)
+  finally:
+    # never leave the other workers waiting for rooms reserved by these agents
+    for agent in active:
+      kb.release(agent)
+
+
+def explore(cave, kb, agents, workers=1):
+  """Lets the agents explore the cave concurrently, sharing the knowledge.
+  The agents are distributed among the given number of worker threads.
+  Returns the number of explored rooms and the elapsed time in seconds.
+  Any exception raised by a worker is raised again once all of them are done."""
+  workers = max(1, min(workers, len(agents)))
+  with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+    start = time.perf_counter()
+    futures = [executor.submit(work, cave, kb, agents[i::workers])
+               for i in range(workers)]
+    concurrent.futures.wait(futures)
+    elapsed = time.perf_counter() - start
+  for future in futures:
+    future.result()
+  return len(list(kb.explored)), elapsed
@@ -7,6 +7,7 @@ import random
 from enumeration import Goal, Status, Action
 from entity import Room, Agent, Knowledge, Cave
 from knowledge import perceive, tell, update, ask
+from team import explore
 
 
 
@@ -50,6 +51,12 @@ def parse_action(action):
     return Action.Shoot, None
 
 
+def parse_option(name, default):
+  if name in sys.argv:
+    return int(sys.argv[sys.argv.index(name) + 1])
+  return default
+
+
 def print_cave(loc):
   print(' __________________')
   y = 0
@@ -69,6 +76,17 @@ if __name__ == '__main__':
   if '-seed' in sys.argv:
     seed = int(sys.argv[sys.argv.index('-seed') + 1])
     random.seed(seed)
+  # let several agents explore the same cave sharing their knowledge
+  if '-agents' in sys.argv:
+    size = (parse_option('-size', 4),) * 2
+    agents = [Agent() for i in range(parse_option('-agents', 1))]
+    cave, kb = Cave(size), Knowledge(size)
+    rooms, elapsed = explore(cave, kb, agents, parse_option('-workers', 1))
+    print('Knowledge:\n{}\n'.format(kb))
+    print('Explored rooms: {}'.format(rooms))
+    print('Elapsed time: {:.6f} s'.format(elapsed))
+    print('Throughput: {:.2f} rooms/s'.format(rooms / elapsed))
+    sys.exit()
   # define entities
   cave = Cave()
   kb = Knowledge()
@@ -94,6 +112,9 @@ if __name__ == '__main__':
       #print('Knowledge updated:\n{}\n'.format(kb))
       goal = Goal.SeekGold if not agent.has_gold else Goal.BackToEntry
       action = ask(kb, agent.location, agent.direction, goal)
+      if action is None:
+        print('No safe action left.')
+        break
       print('Action:\n{} {}\n'.format(*action))
       input('Next?')
     else: